@@ -34,6 +34,8 @@ DDSketch implementations are also available in:
 <a href="https://github.com/DataDog/sketches-py/">Python</a>
 <a href="https://github.com/DataDog/sketches-js/">JavaScript</a>
 """
+from collections import Counter
+import math
 import typing
 
 from .mapping import LogarithmicMapping
@@ -43,6 +45,10 @@ from .store import DenseStore
 
 
 if typing.TYPE_CHECKING:
+    from typing import Dict  # noqa: F401
+    from typing import Iterable  # noqa: F401
+    from typing import List  # noqa: F401
+    from typing import Mapping  # noqa: F401
     from typing import Optional  # noqa: F401
 
     from .mapping import KeyMapping  # noqa: F401
@@ -72,6 +78,18 @@ class BaseDDSketch(object):
         sum: the sum of the values seen by the sketch
     """
 
+    __slots__ = (
+        "_mapping",
+        "_store",
+        "_negative_store",
+        "_zero_count",
+        "_count",
+        "_min",
+        "_max",
+        "_sum",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         mapping,
@@ -85,7 +103,6 @@ class BaseDDSketch(object):
         self._negative_store = negative_store
         self._zero_count = zero_count
 
-        self._relative_accuracy = mapping.relative_accuracy
         self._count = self._negative_store.count + self._zero_count + self._store.count
         self._min = float("+inf")
         self._max = float("-inf")
@@ -111,6 +128,12 @@ class BaseDDSketch(object):
     def count(self):
         return self._count
 
+    @property
+    def relative_accuracy(self):
+        # type: () -> float
+        """float: the accuracy guarantee of the sketch"""
+        return self._mapping.relative_accuracy
+
     @property
     def name(self):
         # type: () -> str
@@ -156,6 +179,80 @@ class BaseDDSketch(object):
         if val > self._max:
             self._max = val
 
+    def add_many(self, values, weights=None):
+        # type: (Iterable[float], Optional[Iterable[float]]) -> None
+        """Add many values to the sketch.
+
+        This is equivalent to calling ``add`` for each value but repeated values
+        are only mapped once and the stores are only updated once per distinct
+        key. The sketch is left unchanged if any of the values is not finite,
+        any of the weights is not a positive finite float or there are not as
+        many weights as values.
+
+        Args:
+            values (Iterable[float]): the values to add
+            weights (Iterable[float], optional): the weights of the values
+        """
+        # Aggregate the weights of repeated values so that each distinct value
+        # is only mapped to a key once
+        count = self._count
+        if weights is None:
+            value_counts = Counter(values)  # type: Mapping[float, float]
+            count += sum(value_counts.values())
+        else:
+            values = list(values)
+            weights = list(weights)
+            if len(values) != len(weights):
+                raise ValueError(
+                    "got %d values but %d weights" % (len(values), len(weights))
+                )
+
+            weighted_counts = {}  # type: Dict[float, float]
+            for val, weight in zip(values, weights):
+                if not (math.isfinite(weight) and weight > 0.0):
+                    raise ValueError("weight must be a positive float, got %r" % weight)
+                weighted_counts[val] = weighted_counts.get(val, 0.0) + weight
+                count += weight
+            value_counts = weighted_counts
+
+        positive_counts = {}  # type: Dict[int, float]
+        negative_counts = {}  # type: Dict[int, float]
+        zero_count = self._zero_count
+        sum_ = self._sum
+        min_ = self._min
+        max_ = self._max
+        mapping = self._mapping
+        mapping_key = mapping.key
+        min_possible = mapping.min_possible
+        negative_min_possible = -min_possible
+        isfinite = math.isfinite
+        for val, weight in value_counts.items():
+            if not isfinite(val):
+                raise ValueError("value must be finite, got %r" % val)
+
+            if val > min_possible:
+                key = mapping_key(val)
+                positive_counts[key] = positive_counts.get(key, 0.0) + weight
+            elif val < negative_min_possible:
+                key = mapping_key(-val)
+                negative_counts[key] = negative_counts.get(key, 0.0) + weight
+            else:
+                zero_count += weight
+
+            sum_ += val * weight
+            if val < min_:
+                min_ = val
+            if val > max_:
+                max_ = val
+
+        self._store.add_many(positive_counts.keys(), positive_counts.values())
+        self._negative_store.add_many(negative_counts.keys(), negative_counts.values())
+        self._zero_count = zero_count
+        self._count = count
+        self._sum = sum_
+        self._min = min_
+        self._max = max_
+
     def get_quantile_value(self, quantile):
         # type: (float) -> Optional[float]
         """Return the approximate value at the specified quantile.
@@ -183,6 +280,54 @@ class BaseDDSketch(object):
             quantile_value = self._mapping.value(key)
         return quantile_value
 
+    def get_quantile_values(self, quantiles):
+        # type: (Iterable[float]) -> List[Optional[float]]
+        """Return the approximate values at the specified quantiles.
+
+        Args:
+            quantiles (Iterable[float]): 0 <= q <=1 for each q
+
+        Returns:
+            the values at the specified quantiles, in the same order, or None
+            for the quantiles that are out of range or if the sketch is empty
+        """
+        # Split the ranks between the stores so that each store is only scanned
+        # once for all the quantiles
+        quantiles = list(quantiles)
+        quantile_values = [None] * len(quantiles)  # type: List[Optional[float]]
+        if self._count == 0:
+            return quantile_values
+
+        negative_count = self._negative_store.count
+        non_positive_count = self._zero_count + negative_count
+        negative_indices = []  # type: List[int]
+        negative_ranks = []  # type: List[float]
+        positive_indices = []  # type: List[int]
+        positive_ranks = []  # type: List[float]
+        for i, quantile in enumerate(quantiles):
+            if quantile < 0 or quantile > 1:
+                continue
+
+            rank = quantile * (self._count - 1)
+            if rank < negative_count:
+                negative_indices.append(i)
+                negative_ranks.append(negative_count - rank - 1)
+            elif rank < non_positive_count:
+                quantile_values[i] = 0
+            else:
+                positive_indices.append(i)
+                positive_ranks.append(rank - self._zero_count - negative_count)
+
+        if negative_ranks:
+            keys = self._negative_store.keys_at_ranks(negative_ranks, lower=False)
+            for i, key in zip(negative_indices, keys):
+                quantile_values[i] = -self._mapping.value(key)
+        if positive_ranks:
+            keys = self._store.keys_at_ranks(positive_ranks)
+            for i, key in zip(positive_indices, keys):
+                quantile_values[i] = self._mapping.value(key)
+        return quantile_values
+
     def merge(self, sketch):
         # type: (BaseDDSketch) -> None
         """Merge the given sketch into this one. After this operation, this sketch
@@ -239,6 +384,8 @@ class DDSketch(BaseDDSketch):
     (cf. http://www.vldb.org/pvldb/vol12/p2195-masson.pdf)
     """
 
+    __slots__ = ()
+
     def __init__(self, relative_accuracy=None):
         # type: (Optional[float]) -> None
         # Make sure the parameters are valid
@@ -266,6 +413,8 @@ class LogCollapsingLowestDenseDDSketch(BaseDDSketch):
     (cf. http://www.vldb.org/pvldb/vol12/p2195-masson.pdf)
     """
 
+    __slots__ = ()
+
     def __init__(self, relative_accuracy=None, bin_limit=None):
         # type: (Optional[float], Optional[int]) -> None
         # Make sure the parameters are valid
@@ -296,6 +445,8 @@ class LogCollapsingHighestDenseDDSketch(BaseDDSketch):
     (cf. http://www.vldb.org/pvldb/vol12/p2195-masson.pdf)
     """
 
+    __slots__ = ()
+
     def __init__(self, relative_accuracy=None, bin_limit=None):
         # type: (Optional[float], Optional[int]) -> None
         # Make sure the parameters are valid
@@ -35,9 +35,11 @@ class KeyMapping(six.with_metaclass(ABCMeta)):
         offset (float): an offset that can be used to shift all bin keys
     Attributes:
         gamma (float): the base for the exponential buckets. gamma = (1 + alpha) / (1 - alpha)
+        _gamma_ln (float): the natural logarithm of gamma
         min_possible: the smallest value the sketch can distinguish from 0
         max_possible: the largest value the sketch can handle
         _multiplier (float): used for calculating log_gamma(value) initially, _multiplier = 1 / log(gamma)
+        _value_scale (float): 2 / (1 + gamma), maps the lower bound of a bucket to its representative value
     """
 
     def __init__(self, relative_accuracy, offset=0.0):
@@ -51,7 +53,9 @@ class KeyMapping(six.with_metaclass(ABCMeta)):
 
         gamma_mantissa = 2 * relative_accuracy / (1 - relative_accuracy)
         self.gamma = 1 + gamma_mantissa
-        self._multiplier = 1 / math.log1p(gamma_mantissa)
+        self._gamma_ln = math.log1p(gamma_mantissa)
+        self._multiplier = 1 / self._gamma_ln
+        self._value_scale = 2.0 / (1 + self.gamma)
         self.min_possible = sys.float_info.min * self.gamma
         self.max_possible = sys.float_info.max / self.gamma
 
@@ -90,7 +94,7 @@ class KeyMapping(six.with_metaclass(ABCMeta)):
         Returns:
             float: the value represented by the bucket specified by the key
         """
-        return self._pow_gamma(key - self._offset) * (2.0 / (1 + self.gamma))
+        return self._pow_gamma(key - self._offset) * self._value_scale
 
 
 class LogarithmicMapping(KeyMapping):
@@ -99,18 +103,23 @@ class LogarithmicMapping(KeyMapping):
     done by logarithmically mapping floating-point values to integers.
     """
 
-    def __init__(self, relative_accuracy, offset=0.0):
-        # type: (float, float) -> None
-        super(LogarithmicMapping, self).__init__(relative_accuracy, offset=offset)
-        self._multiplier *= math.log(2)
+    def key(self, value):
+        # type: (float) -> int
+        """Override. Inline _log_gamma as this is called for every added value."""
+        return int(math.ceil(math.log(value) * self._multiplier) + self._offset)
+
+    def value(self, key):
+        # type: (int) -> float
+        """Override. Inline _pow_gamma as this is called for every queried key."""
+        return math.exp((key - self._offset) * self._gamma_ln) * self._value_scale
 
     def _log_gamma(self, value):
         # type: (float) -> float
-        return math.log(value, 2) * self._multiplier
+        return math.log(value) * self._multiplier
 
     def _pow_gamma(self, value):
         # type: (float) -> float
-        return math.pow(2.0, value / self._multiplier)
+        return math.exp(value * self._gamma_ln)
 
 
 def _cbrt(x):
@@ -128,6 +137,15 @@ class LinearlyInterpolatedMapping(KeyMapping):
     linearly interpolating the logarithm in-between.
     """
 
+    def key(self, value):
+        # type: (float) -> int
+        """Override. Inline _log_gamma as this is called for every added value."""
+        mantissa, exponent = math.frexp(value)
+        significand = 2 * mantissa - 1
+        return int(
+            math.ceil((significand + (exponent - 1)) * self._multiplier) + self._offset
+        )
+
     def _log2_approx(self, value):
         # type: (float) -> float
         """Approximates log2 by s + f
@@ -178,6 +196,23 @@ class CubicallyInterpolatedMapping(KeyMapping):
         )
         self._multiplier /= self.C
 
+    def key(self, value):
+        # type: (float) -> int
+        """Override. Inline _log_gamma as this is called for every added value."""
+        mantissa, exponent = math.frexp(value)
+        significand = 2 * mantissa - 1
+        return int(
+            math.ceil(
+                (
+                    ((self.A * significand + self.B) * significand + self.C)
+                    * significand
+                    + (exponent - 1)
+                )
+                * self._multiplier
+            )
+            + self._offset
+        )
+
     def _cubic_log2_approx(self, value):
         # type: (float) -> float
         """Approximates log2 using a cubic polynomial"""
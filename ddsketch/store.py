@@ -13,13 +13,18 @@ otherwise.
 """
 
 import abc
-import math
+from bisect import bisect_left
+from bisect import bisect_right
+from itertools import accumulate
 import typing
 
 
 if typing.TYPE_CHECKING:
+    from typing import Iterable  # noqa: F401
     from typing import List  # noqa: F401
     from typing import Optional  # noqa: F401
+    from typing import Sequence  # noqa: F401
+    from typing import Tuple  # noqa: F401
 
 import six
 
@@ -55,6 +60,21 @@ _neg_infinity = _NegativeIntInfinity()
 _pos_infinity = _PositiveIntInfinity()
 
 
+def _weighted_keys(keys, weights):
+    # type: (Iterable[int], Optional[Iterable[float]]) -> Tuple[List[int], List[float]]
+    """Return the keys as a list along with their weights, checking that there
+    are as many weights as keys.
+    """
+    keys = list(keys)
+    if weights is None:
+        return keys, [1.0] * len(keys)
+
+    weights = list(weights)
+    if len(keys) != len(weights):
+        raise ValueError("got %d keys but %d weights" % (len(keys), len(weights)))
+    return keys, weights
+
+
 class Store(six.with_metaclass(abc.ABCMeta)):
     """The basic specification of a store
 
@@ -64,6 +84,8 @@ class Store(six.with_metaclass(abc.ABCMeta)):
         max_key (int): the maximum key bin
     """
 
+    __slots__ = ("count", "min_key", "max_key", "__weakref__")
+
     def __init__(self):
         # type: () -> None
         self.count = 0  # type: float
@@ -86,6 +108,16 @@ class Store(six.with_metaclass(abc.ABCMeta)):
         necessary.
         """
 
+    def add_many(self, keys, weights=None):
+        # type: (Iterable[int], Optional[Iterable[float]]) -> None
+        """Updates the counters at the specified keys, in the same order. Every key
+        has a weight of 1.0 if weights are not set. Raises ValueError if there
+        are not as many weights as keys.
+        """
+        keys, weights = _weighted_keys(keys, weights)
+        for key, weight in zip(keys, weights):
+            self.add(key, weight)
+
     @abc.abstractmethod
     def key_at_rank(self, rank, lower=True):
         # type: (float, bool) -> int
@@ -102,6 +134,14 @@ class Store(six.with_metaclass(abc.ABCMeta)):
              key_at_rank(x) = b for x in (0, 1]
         """
 
+    def keys_at_ranks(self, ranks, lower=True):
+        # type: (Sequence[float], bool) -> List[int]
+        """Return the keys for the values at the given ranks, in the same order.
+
+        This is equivalent to calling key_at_rank for each rank.
+        """
+        return [self.key_at_rank(rank, lower=lower) for rank in ranks]
+
     @abc.abstractmethod
     def merge(self, store):
         # type: (Store) -> None
@@ -125,6 +165,8 @@ class DenseStore(Store):
         bins (List[float]): the bins
     """
 
+    __slots__ = ("chunk_size", "offset", "bins")
+
     def __init__(self, chunk_size=CHUNK_SIZE):
         # type: (int) -> None
         super(DenseStore, self).__init__()
@@ -135,15 +177,15 @@ class DenseStore(Store):
 
     def __repr__(self):
         # type: () -> str
-        repr_str = "{"
-        for i, sbin in enumerate(self.bins):
-            repr_str += "%s: %s, " % (i + self.offset, sbin)
-        repr_str += "}}, min_key:%s, max_key:%s, offset:%s" % (
+        bins_str = "".join(
+            "%s: %s, " % (i + self.offset, sbin) for i, sbin in enumerate(self.bins)
+        )
+        return "{%s}}, min_key:%s, max_key:%s, offset:%s" % (
+            bins_str,
             self.min_key,
             self.max_key,
             self.offset,
         )
-        return repr_str
 
     def copy(self, store):
         # type: (DenseStore) -> None
@@ -160,10 +202,28 @@ class DenseStore(Store):
 
     def add(self, key, weight=1.0):
         # type: (int, float) -> None
-        idx = self._get_index(key)
-        self.bins[idx] += weight
+        if self.min_key <= key <= self.max_key:
+            # Fast path: the key is already covered by the bins
+            self.bins[key - self.offset] += weight
+        else:
+            idx = self._get_index(key)
+            self.bins[idx] += weight
         self.count += weight
 
+    def add_many(self, keys, weights=None):
+        # type: (Iterable[int], Optional[Iterable[float]]) -> None
+        """Override. Extend the range of the bins at most once for all the keys."""
+        keys, weights = _weighted_keys(keys, weights)
+        if not keys:
+            return
+
+        min_key = min(keys)
+        max_key = max(keys)
+        if min_key < self.min_key or max_key > self.max_key:
+            self._extend_range(min_key, max_key)
+        for key, weight in zip(keys, weights):
+            self.add(key, weight)
+
     def _get_index(self, key):
         # type: (int) -> int
         """Calculate the bin index for the key, extending the range if necessary."""
@@ -177,7 +237,8 @@ class DenseStore(Store):
     def _get_new_length(self, new_min_key, new_max_key):
         # type: (int, int) -> int
         desired_length = new_max_key - new_min_key + 1
-        return self.chunk_size * int(math.ceil(desired_length / self.chunk_size))
+        # Round up to a multiple of chunk_size with an exact integer ceiling division
+        return self.chunk_size * -(-desired_length // self.chunk_size)
 
     def _extend_range(self, key, second_key=None):
         # type: (int, Optional[int]) -> None
@@ -193,7 +254,7 @@ class DenseStore(Store):
             self.offset = new_min_key
             self._adjust(new_min_key, new_max_key)
 
-        elif new_min_key >= self.min_key and new_max_key < self.offset + self.length():
+        elif new_min_key >= self.offset and new_max_key < self.offset + self.length():
             # no need to change the range; just update min/max keys
             self.min_key = new_min_key
             self.max_key = new_max_key
@@ -217,12 +278,13 @@ class DenseStore(Store):
     def _shift_bins(self, shift):
         # type: (int) -> None
         """Shift the bins; this changes the offset."""
+        # Shift in place rather than slicing the bins into a new list
         if shift > 0:
-            self.bins = self.bins[:-shift]
+            del self.bins[-shift:]
             self.bins[:0] = [0.0] * shift
-        else:
-            self.bins = self.bins[abs(shift) :]
-            self.bins.extend([0.0] * abs(shift))
+        elif shift < 0:
+            del self.bins[:-shift]
+            self.bins.extend([0.0] * -shift)
         self.offset -= shift
 
     def _center_bins(self, new_min_key, new_max_key):
@@ -233,12 +295,27 @@ class DenseStore(Store):
 
     def key_at_rank(self, rank, lower=True):
         # type: (float, bool) -> int
-        running_ct = 0.0
-        for i, bin_ct in enumerate(self.bins):
-            running_ct += bin_ct
-            if (lower and running_ct > rank) or (not lower and running_ct >= rank + 1):
-                return i + self.offset
+        return self._key_at_cumulative_rank(list(accumulate(self.bins)), rank, lower)
+
+    def keys_at_ranks(self, ranks, lower=True):
+        # type: (Sequence[float], bool) -> List[int]
+        """Override. Compute the running bin counts only once for all the ranks."""
+        cumulative_counts = list(accumulate(self.bins))
+        return [
+            self._key_at_cumulative_rank(cumulative_counts, rank, lower)
+            for rank in ranks
+        ]
+
+    def _key_at_cumulative_rank(self, cumulative_counts, rank, lower):
+        # type: (List[float], float, bool) -> int
+        """Binary search the running bin counts for the key at the given rank."""
+        if lower:
+            idx = bisect_right(cumulative_counts, rank)
+        else:
+            idx = bisect_left(cumulative_counts, rank + 1)
 
+        if idx < len(cumulative_counts):
+            return idx + self.offset
         return self.max_key
 
     def merge(self, store):  # type: ignore[override]
@@ -253,11 +330,24 @@ class DenseStore(Store):
         if store.min_key < self.min_key or store.max_key > self.max_key:
             self._extend_range(store.min_key, store.max_key)
 
-        for key in range(store.min_key, store.max_key + 1):
-            self.bins[key - self.offset] += store.bins[key - store.offset]
-
+        self._merge_bins(store, store.min_key, store.max_key + 1)
         self.count += store.count
 
+    def _merge_bins(self, store, start_key, end_key):
+        # type: (DenseStore, int, int) -> None
+        """Add the bins of the input store for the keys in [start_key, end_key) to the
+        bins of this store, whose range must already cover these keys.
+        """
+        start_idx = start_key - self.offset
+        end_idx = end_key - self.offset
+        self.bins[start_idx:end_idx] = [
+            bin_ct + other_bin_ct
+            for bin_ct, other_bin_ct in zip(
+                self.bins[start_idx:end_idx],
+                store.bins[start_key - store.offset : end_key - store.offset],
+            )
+        ]
+
 
 class CollapsingLowestDenseStore(DenseStore):
     """A dense store that keeps all the bins between the bin for the min_key and the
@@ -276,6 +366,8 @@ class CollapsingLowestDenseStore(DenseStore):
         bins (List[int]): the bins
     """
 
+    __slots__ = ("bin_limit", "is_collapsed")
+
     def __init__(self, bin_limit, chunk_size=CHUNK_SIZE):
         # type: (int, int) -> None
         super(CollapsingLowestDenseStore, self).__init__()
@@ -292,7 +384,7 @@ class CollapsingLowestDenseStore(DenseStore):
         # type: (int, int) -> int
         desired_length = new_max_key - new_min_key + 1
         return min(
-            self.chunk_size * int(math.ceil(desired_length / self.chunk_size)),
+            self.chunk_size * -(-desired_length // self.chunk_size),
             self.bin_limit,
         )
 
@@ -375,9 +467,7 @@ class CollapsingLowestDenseStore(DenseStore):
         else:
             collapse_end_idx = collapse_start_idx
 
-        for key in range(collapse_end_idx + store.offset, store.max_key + 1):
-            self.bins[key - self.offset] += store.bins[key - store.offset]
-
+        self._merge_bins(store, collapse_end_idx + store.offset, store.max_key + 1)
         self.count += store.count
 
 
@@ -398,6 +488,8 @@ class CollapsingHighestDenseStore(DenseStore):
         bins (List[int]): the bins
     """
 
+    __slots__ = ("bin_limit", "is_collapsed")
+
     def __init__(self, bin_limit, chunk_size=CHUNK_SIZE):
         super(CollapsingHighestDenseStore, self).__init__()
         self.bin_limit = bin_limit
@@ -415,7 +507,7 @@ class CollapsingHighestDenseStore(DenseStore):
         # For some reason mypy can't infer that min(int, int) is an int, so cast it.
         return int(
             min(
-                self.chunk_size * int(math.ceil(desired_length / self.chunk_size)),
+                self.chunk_size * -(-desired_length // self.chunk_size),
                 self.bin_limit,
             )
         )
@@ -498,7 +590,5 @@ class CollapsingHighestDenseStore(DenseStore):
         else:
             collapse_start_idx = collapse_end_idx
 
-        for key in range(store.min_key, collapse_start_idx + store.offset):
-            self.bins[key - self.offset] += store.bins[key - store.offset]
-
+        self._merge_bins(store, store.min_key, collapse_start_idx + store.offset)
         self.count += store.count
@@ -6,12 +6,18 @@
 import abc
 
 import numpy as np
-import six
 
 
-class Dataset(six.with_metaclass(abc.ABCMeta)):
-    def __init__(self, size):
+class Dataset(abc.ABC):
+    # Generator shared by the datasets that are not given their own
+    rng = np.random.default_rng()
+    _sorted_data = None
+    _sum = None
+
+    def __init__(self, size, rng=None):
         self.size = int(size)
+        if rng is not None:
+            self.rng = rng
         self.data = self.populate()
 
     def __str__(self):
@@ -20,25 +26,35 @@ class Dataset(six.with_metaclass(abc.ABCMeta)):
     def __len__(self):
         return self.size
 
+    @property
+    def sorted_data(self):
+        if self._sorted_data is None:
+            self._sorted_data = np.sort(self.data)
+        return self._sorted_data
+
     def rank(self, value):
-        lower = np.array(sorted(self.data)) < value
-        if np.all(lower):
+        rank = int(np.searchsorted(self.sorted_data, value))
+        if rank == self.size:
             return self.size - 1
-        else:
-            return np.argmin(lower)
+        return rank
 
     def quantile(self, q):
-        self.data.sort()
         rank = int(q * (self.size - 1))
-        return self.data[rank]
+        return self.sorted_data[rank]
+
+    def quantiles(self, qs):
+        ranks = (np.asarray(qs) * (self.size - 1)).astype(int)
+        return self.sorted_data[ranks]
 
     @property
     def sum(self):  # noqa: A003
-        return np.sum(self.data)
+        if self._sum is None:
+            self._sum = np.sum(self.data)
+        return self._sum
 
     @property
     def avg(self):
-        return np.mean(self.data)
+        return self.sum / self.size
 
     @abc.abstractmethod
     def name(self):
@@ -60,10 +76,14 @@ class EmptyDataset(Dataset):
     def add(self, val):
         self.size += 1
         self.data.append(val)
+        self._sorted_data = None
+        self._sum = None
 
     def add_all(self, vals):
         self.size += len(vals)
         self.data.extend(vals)
+        self._sorted_data = None
+        self._sum = None
 
 
 class UniformForward(Dataset):
@@ -232,32 +252,32 @@ class Exponential(Dataset):
     scale = 0.01
 
     @classmethod
-    def from_params(cls, scale, n):
+    def from_params(cls, scale, n, rng=None):
         cls.scale = scale
-        return cls(n)
+        return cls(n, rng=rng)
 
     @property
     def name(self):
         return "exponential"
 
     def populate(self):
-        return np.random.exponential(scale=self.scale, size=self.size)
+        return self.rng.exponential(scale=self.scale, size=self.size)
 
 
 class Lognormal(Dataset):
     scale = 100.0
 
     @classmethod
-    def from_params(cls, scale, n):
+    def from_params(cls, scale, n, rng=None):
         cls.scale = scale
-        return cls(n)
+        return cls(n, rng=rng)
 
     @property
     def name(self):
         return "lognormal"
 
     def populate(self):
-        return np.random.lognormal(size=self.size) / self.scale
+        return self.rng.lognormal(size=self.size) / self.scale
 
 
 class Normal(Dataset):
@@ -265,17 +285,17 @@ class Normal(Dataset):
     scale = 1.0
 
     @classmethod
-    def from_params(cls, loc, scale, n):
+    def from_params(cls, loc, scale, n, rng=None):
         cls.loc = loc
         cls.scale = scale
-        return cls(n)
+        return cls(n, rng=rng)
 
     @property
     def name(self):
         return "normal"
 
     def populate(self):
-        return np.random.normal(loc=self.loc, scale=self.scale, size=self.size)
+        return self.rng.normal(loc=self.loc, scale=self.scale, size=self.size)
 
 
 class Laplace(Dataset):
@@ -283,17 +303,17 @@ class Laplace(Dataset):
     scale = 100.0
 
     @classmethod
-    def from_params(cls, loc, scale, n):
+    def from_params(cls, loc, scale, n, rng=None):
         cls.loc = loc
         cls.scale = scale
-        return cls(n)
+        return cls(n, rng=rng)
 
     @property
     def name(self):
         return "laplace"
 
     def populate(self):
-        return np.random.laplace(loc=self.loc, scale=self.scale, size=self.size)
+        return self.rng.laplace(loc=self.loc, scale=self.scale, size=self.size)
 
 
 class Bimodal(Dataset):
@@ -306,13 +326,11 @@ class Bimodal(Dataset):
         return "bimodal"
 
     def populate(self):
-        return [next(self.generate()) for _ in range(int(self.size))]
-
-    def generate(self):
-        if np.random.random() > 0.5:
-            yield np.random.laplace(self.right_loc)
-        else:
-            yield np.random.normal(self.left_loc, self.left_std)
+        return np.where(
+            self.rng.random(self.size) > 0.5,
+            self.rng.laplace(self.right_loc, size=self.size),
+            self.rng.normal(self.left_loc, self.left_std, size=self.size),
+        )
 
 
 class Mixed(Dataset):
@@ -323,8 +341,10 @@ class Mixed(Dataset):
     loc = 10.0
     scale = 0.5
 
-    def __init__(self, size, ratio=0.9, ignore_rank=False):
+    def __init__(self, size, ratio=0.9, ignore_rank=False, rng=None):
         self.size = int(size)
+        if rng is not None:
+            self.rng = rng
         self.ratio = ratio
         self.data = self.populate()
         self._ignore_rank = ignore_rank
@@ -334,13 +354,12 @@ class Mixed(Dataset):
         return "mixed"
 
     def populate(self):
-        return [next(self.generate()) for _ in range(int(self.size))]
-
-    def generate(self):
-        if np.random.random() < self.ratio:
-            yield self.scale_factor * np.random.lognormal(self.mean, self.sigma)
-        else:
-            yield np.random.normal(self.loc, self.scale)
+        return np.where(
+            self.rng.random(self.size) < self.ratio,
+            self.scale_factor
+            * self.rng.lognormal(self.mean, self.sigma, size=self.size),
+            self.rng.normal(self.loc, self.scale, size=self.size),
+        )
 
 
 class Trimodal(Dataset):
@@ -354,15 +373,15 @@ class Trimodal(Dataset):
         return "trimodal"
 
     def populate(self):
-        return [next(self.generate()) for _ in range(int(self.size))]
-
-    def generate(self):
-        if np.random.random() > 2.0 / 3.0:
-            yield np.random.laplace(self.right_loc)
-        elif np.random.random() > 1.0 / 3.0:
-            yield np.random.normal(self.left_loc, self.left_std)
-        else:
-            yield np.random.exponential(scale=self.exp_scale)
+        return np.where(
+            self.rng.random(self.size) > 2.0 / 3.0,
+            self.rng.laplace(self.right_loc, size=self.size),
+            np.where(
+                self.rng.random(self.size) > 1.0 / 3.0,
+                self.rng.normal(self.left_loc, self.left_std, size=self.size),
+                self.rng.exponential(scale=self.exp_scale, size=self.size),
+            ),
+        )
 
 
 class Integers(Dataset):
@@ -370,10 +389,10 @@ class Integers(Dataset):
     scale = 5.0
 
     @classmethod
-    def from_params(cls, loc, scale, n):
+    def from_params(cls, loc, scale, n, rng=None):
         cls.loc = loc
         cls.scale = scale
-        return cls(n)
+        return cls(n, rng=rng)
 
     @property
     def name(self):
@@ -382,5 +401,5 @@ class Integers(Dataset):
     def populate(self):
         return [
             int(x)
-            for x in np.random.normal(loc=self.loc, scale=self.scale, size=self.size)
+            for x in self.rng.normal(loc=self.loc, scale=self.scale, size=self.size)
         ]
@@ -8,10 +8,10 @@
 import abc
 from collections import Counter
 from unittest import TestCase
+import weakref
 
 import numpy as np
 import pytest
-import six
 
 import ddsketch
 from ddsketch.ddsketch import DDSketch
@@ -65,7 +65,16 @@ TEST_REL_ACC = 0.05
 TEST_BIN_LIMIT = 1024
 
 
-class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
+def _summary(sketch):
+    """Return the quantiles and summary stats of a sketch"""
+    return sketch.get_quantile_values(TEST_QUANTILES) + [
+        sketch.sum,
+        sketch.avg,
+        sketch.num_values,
+    ]
+
+
+class BaseTestDDSketches(abc.ABC):
     """AbstractBaseClass for testing DDSketch implementations"""
 
     @staticmethod
@@ -75,25 +84,24 @@ class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
 
     def _evaluate_sketch_accuracy(self, sketch, data, eps, summary_stats=True):
         size = data.size
-        for quantile in TEST_QUANTILES:
-            sketch_q = sketch.get_quantile_value(quantile)
-            data_q = data.quantile(quantile)
-            err = abs(sketch_q - data_q)
-            assert err - eps * abs(data_q) <= 1e-15
+        sketch_qs = np.array(sketch.get_quantile_values(TEST_QUANTILES), dtype=float)
+        data_qs = data.quantiles(TEST_QUANTILES)
+        errs = np.abs(sketch_qs - data_qs) - eps * np.abs(data_qs)
+        assert (errs <= 1e-15).all(), errs
         assert sketch.num_values == size
         if summary_stats:
-            assert sketch.sum == pytest.approx(data.sum)
-            assert sketch.avg == pytest.approx(data.avg)
+            assert [sketch.sum, sketch.avg] == pytest.approx([data.sum, data.avg])
 
     def test_distributions(self):
         """Test DDSketch on values from various distributions"""
         for dataset in DATASETS:
             for size in TEST_SIZES:
-                data = dataset(size)
-                sketch = self._new_dd_sketch()
-                for value in data.data:
-                    sketch.add(value)
-                self._evaluate_sketch_accuracy(sketch, data, TEST_REL_ACC)
+                with self.subTest(dataset=dataset.__name__, size=size):
+                    data = dataset(size)
+                    sketch = self._new_dd_sketch()
+                    for value in data.data:
+                        sketch.add(value)
+                    self._evaluate_sketch_accuracy(sketch, data, TEST_REL_ACC)
 
     def test_add_multiple(self):
         """Test DDSketch on adding integer weighted values"""
@@ -118,18 +126,91 @@ class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
         assert sketch.sum == pytest.approx(5445 + 11000)
         assert sketch.avg == pytest.approx(74.75)
 
+    def test_add_many(self):
+        """Test that adding values in bulk is equivalent to adding them one by one"""
+        data = Mixed(1000)
+        weights = [1.0 + (i % 3) for i in range(data.size)]
+        sketch = self._new_dd_sketch()
+        for value, weight in zip(data.data, weights):
+            sketch.add(value, weight)
+        bulk_sketch = self._new_dd_sketch()
+        bulk_sketch.add_many(data.data, weights)
+
+        assert bulk_sketch.num_values == pytest.approx(sketch.num_values)
+        assert bulk_sketch.sum == pytest.approx(sketch.sum)
+        assert [bulk_sketch.get_quantile_value(q) for q in TEST_QUANTILES] == [
+            sketch.get_quantile_value(q) for q in TEST_QUANTILES
+        ]
+
+    def test_add_many_repeated(self):
+        """Test adding repeated values in bulk"""
+        data = Integers(1000)
+        sketch = self._new_dd_sketch()
+        sketch.add_many(data.data)
+        self._evaluate_sketch_accuracy(sketch, data, TEST_REL_ACC)
+
+    def test_weakref(self):
+        """Test that sketches can be weakly referenced"""
+        sketch = self._new_dd_sketch()
+        assert weakref.ref(sketch)() is sketch
+
+    def test_relative_accuracy(self):
+        """Test that the sketch exposes the relative accuracy of its mapping"""
+        assert self._new_dd_sketch().relative_accuracy == TEST_REL_ACC
+
+    def test_add_many_invalid_weight(self):
+        """Test that adding values in bulk with an invalid weight changes nothing"""
+        sketch = self._new_dd_sketch()
+        for weight in [0.0, -1.0, float("nan"), float("inf")]:
+            with pytest.raises(ValueError):
+                sketch.add_many([1.0, 2.0, 3.0], [1.0, weight, 1.0])
+        assert sketch.num_values == 0
+        assert sketch.get_quantile_value(0.5) is None
+
+    def test_add_many_mismatched_weights(self):
+        """Test that adding values in bulk with too few or too many weights changes
+        nothing
+        """
+        sketch = self._new_dd_sketch()
+        for weights in [[1.0], [1.0, 1.0, 1.0, 1.0]]:
+            with pytest.raises(ValueError):
+                sketch.add_many([1.0, 2.0, 3.0], weights)
+        assert sketch.num_values == 0
+        assert sketch.get_quantile_value(0.5) is None
+
+    def test_add_many_non_finite_value(self):
+        """Test that adding non-finite values in bulk changes nothing"""
+        sketch = self._new_dd_sketch()
+        for value in [float("nan"), float("inf"), float("-inf")]:
+            with pytest.raises(ValueError):
+                sketch.add_many([1.0, value, 3.0])
+        assert sketch.num_values == 0
+        assert sketch.get_quantile_value(0.5) is None
+
+    def test_get_quantile_values(self):
+        """Test that batched quantile queries match single quantile queries"""
+        sketch = self._new_dd_sketch()
+        assert sketch.get_quantile_values(TEST_QUANTILES) == [None] * len(
+            TEST_QUANTILES
+        )
+        sketch.add_many(NumberLineForward(100).data)
+        quantiles = [-0.1] + TEST_QUANTILES + [0.3, 1.1]
+        assert sketch.get_quantile_values(quantiles) == [
+            sketch.get_quantile_value(q) for q in quantiles
+        ]
+
     def test_merge_equal(self):
         """Test merging equal-sized DDSketches"""
         parameters = [(35, 1), (1, 3), (15, 2), (40, 0.5)]
+        rng = np.random.default_rng()
         for size in TEST_SIZES:
             dataset = EmptyDataset(0)
             target_sketch = self._new_dd_sketch()
             for params in parameters:
-                generator = Normal.from_params(params[0], params[1], size)
+                generator = Normal.from_params(params[0], params[1], size, rng=rng)
                 sketch = self._new_dd_sketch()
-                for value in generator.data:
-                    sketch.add(value)
-                    dataset.add(value)
+                sketch.add_many(generator.data)
+                dataset.add_all(generator.data)
                 target_sketch.merge(sketch)
                 self._evaluate_sketch_accuracy(target_sketch, dataset, TEST_REL_ACC)
 
@@ -138,16 +219,15 @@ class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
     def test_merge_unequal(self):
         """Test merging variable-sized DDSketches"""
         ntests = 20
+        rng = np.random.default_rng()
         for _ in range(ntests):
             for size in TEST_SIZES:
-                dataset = Lognormal(size)
+                dataset = Lognormal(size, rng=rng)
                 sketch1 = self._new_dd_sketch()
                 sketch2 = self._new_dd_sketch()
-                for value in dataset.data:
-                    if np.random.random() > 0.7:
-                        sketch1.add(value)
-                    else:
-                        sketch2.add(value)
+                mask = rng.random(dataset.size) > 0.7
+                sketch1.add_many(dataset.data[mask])
+                sketch2.add_many(dataset.data[~mask])
                 sketch1.merge(sketch2)
                 self._evaluate_sketch_accuracy(sketch1, dataset, TEST_REL_ACC)
 
@@ -155,15 +235,15 @@ class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
         """Test merging DDSketches of different distributions"""
         ntests = 20
         test_datasets = [Normal, Exponential, Laplace, Bimodal]
+        rng = np.random.default_rng()
         for _ in range(ntests):
             merged_dataset = EmptyDataset(0)
             merged_sketch = self._new_dd_sketch()
             for dataset in test_datasets:
-                generator = dataset(np.random.randint(0, 500))
+                generator = dataset(rng.integers(0, 500), rng=rng)
                 sketch = self._new_dd_sketch()
-                for value in generator.data:
-                    sketch.add(value)
-                    merged_dataset.add(value)
+                sketch.add_many(generator.data)
+                merged_dataset.add_all(generator.data)
                 merged_sketch.merge(sketch)
             self._evaluate_sketch_accuracy(merged_sketch, merged_dataset, TEST_REL_ACC)
 
@@ -172,44 +252,26 @@ class BaseTestDDSketches(six.with_metaclass(abc.ABCMeta)):
         sketch1 = self._new_dd_sketch()
         sketch2 = self._new_dd_sketch()
         dataset = Normal(100)
-        for value in dataset.data:
-            sketch1.add(value)
+        sketch1.add_many(dataset.data)
         sketch1.merge(sketch2)
         # sketch2 is still empty
         assert sketch2.num_values == 0
 
         dataset = Normal(50)
-        for value in dataset.data:
-            sketch2.add(value)
+        sketch2.add_many(dataset.data)
 
-        sketch2_summary = [sketch2.get_quantile_value(q) for q in TEST_QUANTILES] + [
-            sketch2.sum,
-            sketch2.avg,
-            sketch2.num_values,
-        ]
+        sketch2_summary = _summary(sketch2)
         sketch1.merge(sketch2)
 
         dataset = Normal(10)
-        for value in dataset.data:
-            sketch1.add(value)
+        sketch1.add_many(dataset.data)
         # changes to sketch1 does not affect sketch2 after merge
-        sketch2_summary = [sketch2.get_quantile_value(q) for q in TEST_QUANTILES] + [
-            sketch2.sum,
-            sketch2.avg,
-            sketch2.num_values,
-        ]
-        assert sketch2_summary == pytest.approx(
-            [sketch2.get_quantile_value(q) for q in TEST_QUANTILES]
-            + [sketch2.sum, sketch2.avg, sketch2.num_values],
-        )
+        assert _summary(sketch2) == pytest.approx(sketch2_summary)
 
         sketch3 = self._new_dd_sketch()
         sketch3.merge(sketch2)
         # merging to an empty sketch does not change sketch2
-        assert sketch2_summary == pytest.approx(
-            [sketch2.get_quantile_value(q) for q in TEST_QUANTILES]
-            + [sketch2.sum, sketch2.avg, sketch2.num_values],
-        )
+        assert _summary(sketch2) == pytest.approx(sketch2_summary)
 
 
 class TestDDSketch(BaseTestDDSketches, TestCase):
@@ -236,6 +298,38 @@ class TestLogCollapsingHighestDenseDDSketch(BaseTestDDSketches, TestCase):
         return LogCollapsingHighestDenseDDSketch(TEST_REL_ACC, TEST_BIN_LIMIT)
 
 
+def _nonzero_bins(store):
+    """Return the non-zero bin counts of a store by key"""
+    return {i + store.offset: b for i, b in enumerate(store.bins) if b != 0}
+
+
+@pytest.mark.parametrize(
+    "sketch_cls", [LogCollapsingLowestDenseDDSketch, LogCollapsingHighestDenseDDSketch]
+)
+def test_add_many_collapsing(sketch_cls):
+    """Test that adding values in bulk to a collapsing sketch is equivalent to
+    adding them one by one
+    """
+    data = Mixed(1000)
+    values = np.concatenate([data.data, -data.data[:300]])
+    weights = [1.0 + (i % 3) for i in range(values.size)]
+    sketch = sketch_cls(TEST_REL_ACC, 32)
+    for value, weight in zip(values, weights):
+        sketch.add(value, weight)
+    bulk_sketch = sketch_cls(TEST_REL_ACC, 32)
+    bulk_sketch.add_many(values, weights)
+
+    assert sketch._store.is_collapsed
+    assert bulk_sketch._store.is_collapsed
+    assert _nonzero_bins(bulk_sketch._store) == _nonzero_bins(sketch._store)
+    assert _nonzero_bins(bulk_sketch._negative_store) == _nonzero_bins(
+        sketch._negative_store
+    )
+    assert bulk_sketch.num_values == sketch.num_values
+    bulk_quantiles = bulk_sketch.get_quantile_values(TEST_QUANTILES)
+    assert bulk_quantiles == sketch.get_quantile_values(TEST_QUANTILES)
+
+
 def test_version():
     """Ensure the package version is exposed by the API."""
     assert hasattr(ddsketch, "__version__")
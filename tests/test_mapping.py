@@ -11,7 +11,6 @@ from unittest import TestCase
 
 import numpy
 import pytest
-import six
 
 from ddsketch.mapping import CubicallyInterpolatedMapping
 from ddsketch.mapping import LinearlyInterpolatedMapping
@@ -55,7 +54,7 @@ def _test_value_rel_acc(mapping):
     return max_relative_acc
 
 
-class BaseTestKeyMapping(six.with_metaclass(abc.ABCMeta)):
+class BaseTestKeyMapping(abc.ABC):
     """Abstract class for testing KeyMapping classes"""
 
     offsets = [0, 1, -12.23, 7768.3]
@@ -82,6 +81,17 @@ class BaseTestKeyMapping(six.with_metaclass(abc.ABCMeta)):
             mapping = self.mapping(0.01, offset=offset)
             assert mapping.key(1) == int(offset)
 
+    def test_key_matches_log_gamma(self):
+        """Test that key is consistent with _log_gamma"""
+        for offset in self.offsets:
+            mapping = self.mapping(0.01, offset=offset)
+            value = mapping.min_possible
+            while value < mapping.max_possible:
+                assert mapping.key(value) == int(
+                    math.ceil(mapping._log_gamma(value)) + offset
+                )
+                value *= 1.1
+
 
 class TestLogarithmicMapping(BaseTestKeyMapping, TestCase):
     """Class for testing LogarithmicMapping class"""
@@ -2,7 +2,6 @@ import abc
 from unittest import TestCase
 
 import pytest
-import six
 
 from ddsketch.mapping import CubicallyInterpolatedMapping
 from ddsketch.mapping import LinearlyInterpolatedMapping
@@ -15,7 +14,7 @@ from tests.test_ddsketch import TestDDSketch
 from tests.test_store import TestDenseStore
 
 
-class BaseTestKeyMappingProto(six.with_metaclass(abc.ABCMeta)):
+class BaseTestKeyMappingProto(abc.ABC):
     offsets = [0, 1, -12.23, 7768.3]
 
     def test_round_trip(self):
@@ -9,8 +9,9 @@ import abc
 from collections import Counter
 import sys
 from unittest import TestCase
+import weakref
 
-import six
+import pytest
 
 from ddsketch.store import CollapsingHighestDenseStore
 from ddsketch.store import CollapsingLowestDenseStore
@@ -22,7 +23,31 @@ EXTREME_MAX = sys.maxsize
 EXTREME_MIN = -sys.maxsize - 1
 
 
-class BaseTestStore(six.with_metaclass(abc.ABCMeta)):
+def _test_collapsed_values(store, values, lowest):
+    """Test a collapsing store's bin counts against what we expect, given
+    whether the store collapses its lowest or its highest keys
+    """
+    counter = Counter(values)
+    expected_total_count = sum(counter.values())
+    assert expected_total_count == sum(store.bins)
+    if expected_total_count == 0:
+        assert not any(store.bins)
+    else:
+        assert any(store.bins)
+
+        if lowest:
+            min_storable_index = max(counter) - store.bin_limit + 1
+            counter = Counter([max(x, min_storable_index) for x in values])
+        else:
+            max_storable_index = min(counter) + store.bin_limit - 1
+            counter = Counter([min(x, max_storable_index) for x in values])
+
+        for i, sbin in enumerate(store.bins):
+            if sbin != 0:
+                assert counter[i + store.offset] == sbin
+
+
+class BaseTestStore(abc.ABC):
     """Base class for testing Store classes"""
 
     @abc.abstractmethod
@@ -117,6 +142,11 @@ class BaseTestStore(six.with_metaclass(abc.ABCMeta)):
         self._test_merging([[0], [EXTREME_MIN, EXTREME_MAX]])
         self._test_merging([[EXTREME_MIN, EXTREME_MAX], [0]])
 
+    def test_weakref(self):
+        """Test that stores can be weakly referenced"""
+        store = CollapsingLowestDenseStore(10)
+        assert weakref.ref(store)() is store
+
     def test_copying_empty(self):
         """Test copying empty stores"""
         store = CollapsingLowestDenseStore(10)
@@ -141,11 +171,10 @@ class TestDenseStore(BaseTestStore, TestCase):
         expected_total_count = sum(counter.values())
         assert expected_total_count == sum(store.bins)
         if expected_total_count == 0:
-            assert all([x == 0 for x in store.bins])
+            assert not any(store.bins)
         else:
-            assert not all([x == 0 for x in store.bins])
+            assert any(store.bins)
 
-            counter = Counter(values)
             for i, sbin in enumerate(store.bins):
                 if sbin != 0:
                     assert counter[i + store.offset] == sbin
@@ -156,6 +185,10 @@ class TestDenseStore(BaseTestStore, TestCase):
             store.add(val)
         self._test_values(store, values)
 
+        bulk_store = DenseStore()
+        bulk_store.add_many(values)
+        self._test_values(bulk_store, values)
+
     def _test_merging(self, list_values):
         store = DenseStore()
 
@@ -187,6 +220,28 @@ class TestDenseStore(BaseTestStore, TestCase):
         assert store.key_at_rank(0.5, lower=False) == 10
         assert store.key_at_rank(1.5, lower=False) == 100
 
+    def test_keys_at_ranks(self):
+        """Test that keys_at_ranks matches key_at_rank for unsorted ranks"""
+        store = DenseStore()
+        for key in [4, 10, 10, 100, -3]:
+            store.add(key)
+        ranks = [2.5, 0, 4, 1.5, -0.5, 0.5, 3, 10]
+        for lower in (True, False):
+            assert store.keys_at_ranks(ranks, lower=lower) == [
+                store.key_at_rank(rank, lower=lower) for rank in ranks
+            ]
+
+    def test_add_many_mismatched_weights(self):
+        """Test that adding keys in bulk with too few or too many weights changes
+        nothing
+        """
+        store = DenseStore()
+        for weights in [[1.0], [1.0, 1.0, 1.0, 1.0]]:
+            with pytest.raises(ValueError):
+                store.add_many([1, 2, 3], weights)
+        assert store.count == 0
+        assert store.bins == []
+
     def test_extreme_values(self):
         """Override. DenseStore is not meant to be used with values that are extremely
         far from one another as it would allocate an excessively large
@@ -204,22 +259,7 @@ class TestCollapsingLowestDenseStore(BaseTestStore, TestCase):
     """Class for testing the CollapsingLowestDenseStore class"""
 
     def _test_values(self, store, values):
-        counter = Counter(values)
-        expected_total_count = sum(counter.values())
-        assert expected_total_count == sum(store.bins)
-
-        if expected_total_count == 0:
-            assert all([x == 0 for x in store.bins])
-        else:
-            assert not all([x == 0 for x in store.bins])
-
-            max_index = max(counter)
-            min_storable_index = max(float("-inf"), max_index - store.bin_limit + 1)
-            counter = Counter([max(x, min_storable_index) for x in values])
-
-            for i, sbin in enumerate(store.bins):
-                if sbin != 0:
-                    assert counter[i + store.offset] == sbin
+        _test_collapsed_values(store, values, lowest=True)
 
     def _test_store(self, values):
         for bin_limit in TEST_BIN_LIMIT:
@@ -228,6 +268,10 @@ class TestCollapsingLowestDenseStore(BaseTestStore, TestCase):
                 store.add(val)
             self._test_values(store, values)
 
+            bulk_store = CollapsingLowestDenseStore(bin_limit)
+            bulk_store.add_many(values)
+            self._test_values(bulk_store, values)
+
     def _test_merging(self, list_values):
         for bin_limit in TEST_BIN_LIMIT:
             store = CollapsingLowestDenseStore(bin_limit)
@@ -245,22 +289,7 @@ class TestCollapsingHighestDenseStore(BaseTestStore, TestCase):
     """Class for testing the CollapsingHighestDenseStore class"""
 
     def _test_values(self, store, values):
-        counter = Counter(values)
-
-        expected_total_count = sum(counter.values())
-        assert expected_total_count == sum(store.bins)
-        if expected_total_count == 0:
-            assert all([x == 0 for x in store.bins])
-        else:
-            assert not all([x == 0 for x in store.bins])
-
-            min_index = min(counter)
-            max_storable_index = min(float("+inf"), min_index + store.bin_limit - 1)
-            counter = Counter([min(x, max_storable_index) for x in values])
-
-            for i, sbin in enumerate(store.bins):
-                if sbin != 0:
-                    assert counter[i + store.offset] == sbin
+        _test_collapsed_values(store, values, lowest=False)
 
     def _test_store(self, values):
         for bin_limit in TEST_BIN_LIMIT[1:2]:
@@ -269,6 +298,10 @@ class TestCollapsingHighestDenseStore(BaseTestStore, TestCase):
                 store.add(val)
             self._test_values(store, values)
 
+            bulk_store = CollapsingHighestDenseStore(bin_limit)
+            bulk_store.add_many(values)
+            self._test_values(bulk_store, values)
+
     def _test_merging(self, list_values):
         for bin_limit in TEST_BIN_LIMIT:
             store = CollapsingHighestDenseStore(bin_limit)